@@ -2,6 +2,8 @@
 import os
 import time
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import partial
 from datetime import datetime
 import multiprocessing as mp
@@ -24,6 +26,122 @@ class PP_API():
         self.mp_util = MP_Util  # multiprocessing for certain queries
         self.mp_util.API_KEY = api_key
         self.us_holidays = holidays.UnitedStates() # remove holidays
+        self._in_flight = {}  # end_point -> Future, merges identical concurrent requests
+        self._in_flight_lock = threading.Lock()
+
+    def _get_json_shared(self, end_point, timeout=30):
+        """
+        Gets the json of an end point, sharing the response with any identical request already in flight
+
+        registers a Future for the end point > first caller queries, later callers wait on it >
+        Future is dropped once the response (or error) is in
+
+        :param end_point: (str) - full url
+        :param timeout: (int) - seconds before the query is abandoned
+        :return: (dict)
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(end_point)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[end_point] = future
+        if owner:
+            try:
+                future.set_result(requests.get(end_point, timeout=timeout).json())
+            except BaseException as e:  # waiting callers must see KeyboardInterrupt etc. too
+                future.set_exception(e)
+            finally:
+                with self._in_flight_lock:
+                    del self._in_flight[end_point]
+        return future.result()
+
+    # v1 last trade / last quote columns, both bulk paths return exactly these
+    _LAST_COLUMNS = {"lastTrade": ["price", "size", "exchange",
+                                   "cond1", "cond2", "cond3", "cond4", "timestamp"],
+                     "lastQuote": ["askprice", "asksize", "askexchange",
+                                   "bidprice", "bidsize", "bidexchange", "timestamp"]
+                     }
+
+    @staticmethod
+    def _check_status(data, query):
+        """
+        Raises if a polygon response is an error
+
+        :param data: (dict) - response json
+        :param query: (str) - what was queried, for the error message
+        :return: (str) - the response status
+        """
+        status = data.get("status")
+        if status not in ("OK", "success", "NOTFOUND"):
+            raise Exception(f"{query} failed ({status}): {data.get('error', data.get('message'))}")
+        return status
+
+    @staticmethod
+    def _snapshot_last_row(last, snapshot_key):
+        """
+        Converts a snapshot lastTrade/lastQuote dict to the v1 last trade/quote fields
+
+        :param last: (dict) - snapshot lastTrade / lastQuote
+        :param snapshot_key: (str) - lastTrade / lastQuote
+        :return: (dict)
+        """
+        if snapshot_key == "lastTrade":
+            conditions = list(last.get("c") or [])[:4]
+            row = {"price": last.get("p"),
+                   "size": last.get("s"),
+                   "exchange": last.get("x")}
+            row.update({f"cond{i + 1}": cond for i, cond in enumerate(conditions)})
+        else:
+            row = {"askprice": last.get("P"),
+                   "asksize": last.get("S"),
+                   "bidprice": last.get("p"),
+                   "bidsize": last.get("s")}  # snapshot quotes carry no exchanges
+        if last.get("t") is not None:
+            row["timestamp"] = int(last["t"]) // 1_000_000  # ns -> ms, same as v1
+        return row
+
+    def _get_last_bulk(self, tickers, snapshot_key, v1_path, snapshot_threshold, max_workers):
+        """
+        Gets last trade/quote for many tickers as one ticker indexed dataframe
+
+        dedupe tickers > if at least {snapshot_threshold} tickers, one full market snapshot filtered
+        down to the tickers, otherwise concurrent v1 per ticker queries > reindex to tickers and
+        the v1 columns
+
+        Error responses raise. Tickers that are not found or have no trade/quote are NaN rows
+
+        :param tickers: (list) - ticker symbols
+        :param snapshot_key: (str) - lastTrade / lastQuote
+        :param v1_path: (str) - last / last_quote
+        :param snapshot_threshold: (int) - ticker count at which the snapshot is used
+        :param max_workers: (int) - threads for per ticker queries
+        :return: pd.DataFrame, index=ticker
+        """
+        tickers = [ticker.upper() for ticker in tickers]
+        unique_tickers = list(dict.fromkeys(tickers))
+        if len(unique_tickers) >= snapshot_threshold:
+            end_point = f"https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/tickers?apiKey={self.API_KEY}"
+            data = self._get_json_shared(end_point)
+            self._check_status(data, "snapshot")
+            wanted = set(unique_tickers)
+            rows = {snap["ticker"]: self._snapshot_last_row(snap[snapshot_key], snapshot_key)
+                    for snap in data.get("tickers") or []
+                    if snap["ticker"] in wanted and snap.get(snapshot_key)}
+        else:
+            end_points = [f"https://api.polygon.io/v1/{v1_path}/stocks/{ticker}?apiKey={self.API_KEY}"
+                          for ticker in unique_tickers]
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(end_points)))) as pool:
+                responses = list(pool.map(self._get_json_shared, end_points))
+            rows = {}
+            for ticker, data in zip(unique_tickers, responses):
+                if self._check_status(data, ticker) != "NOTFOUND" and data.get("last"):
+                    rows[ticker] = data["last"]
+        df = pd.DataFrame.from_dict(rows, orient="index")
+        df = df.reindex(index=unique_tickers, columns=self._LAST_COLUMNS[snapshot_key])
+        df["timestamp"] = df["timestamp"].astype("Int64")  # stays int ms with NaN rows
+        df.index.name = "ticker"
+        return df
 
     def _multilevel_df(self, content):
         """
@@ -392,6 +510,36 @@ class PP_API():
         data = content.json()
         return data["last"]
 
+    def get_last_trades(self, tickers, snapshot_threshold=100, max_workers=16):
+        """
+        Gets the last confirmed trade for multiple symbols
+
+        Small lists are queried concurrently per ticker, lists of {snapshot_threshold} or more
+        are served from one full market snapshot. Tickers without a trade are NaN rows,
+        error responses raise. Columns are the same as get_last_trade either way
+
+        :param tickers: (list) - ticker symbols
+        :param snapshot_threshold: (int) - ticker count at which the snapshot is used
+        :param max_workers: (int) - threads for per ticker queries
+        :return: pd.DataFrame, index=ticker
+        """
+        return self._get_last_bulk(tickers, "lastTrade", "last", snapshot_threshold, max_workers)
+
+    def get_last_quotes(self, tickers, snapshot_threshold=100, max_workers=16):
+        """
+        Gets the last NBBO quote for multiple symbols
+
+        Small lists are queried concurrently per ticker, lists of {snapshot_threshold} or more
+        are served from one full market snapshot. Tickers without a quote are NaN rows,
+        error responses raise. Columns are the same as get_last_quote either way
+
+        :param tickers: (list) - ticker symbols
+        :param snapshot_threshold: (int) - ticker count at which the snapshot is used
+        :param max_workers: (int) - threads for per ticker queries
+        :return: pd.DataFrame, index=ticker
+        """
+        return self._get_last_bulk(tickers, "lastQuote", "last_quote", snapshot_threshold, max_workers)
+
     def get_daily_open_close(self, ticker, date=datetime.now()):
         """
         Gets open and close of a given date (daily aggregation)